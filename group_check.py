@@ -6,17 +6,36 @@ This utility checks if any members of proposed student groups have previously
 been in a group together, which may violate group formation rules.
 """
 
+import codecs
+import io
 import json
+import os
+import pickle
+import re
 import sys
-from itertools import combinations
-from typing import List, Set, Tuple
+import tempfile
+from itertools import chain, combinations
+from typing import IO, Iterable, Iterator, List, Optional, Set, Tuple
 from pathlib import Path
 import argparse
+import functools
+import heapq
 
 
 class GroupChecker:
     """Handles checking for conflicts between previous and proposed student groups."""
 
+    __slots__ = ('previous_groups', 'previous_students', '_id', '_pairs', '_adj')
+
+    # Rosters of up to BITSET_MAX_STUDENTS students whose previous groups average
+    # at least BITSET_MIN_GROUP_SIZE members are indexed as a bitset of each
+    # student's previous partners instead of a set of pairs, so a whole proposed
+    # group is checked with one AND per member. For smaller groups the pair set
+    # is cheaper to build and just as fast to check, and for larger rosters the
+    # wide ints cost more than set lookups
+    BITSET_MAX_STUDENTS = 1024
+    BITSET_MIN_GROUP_SIZE = 5
+
     def __init__(self, previous_groups: List[List[str]]):
         """
         Initialize the group checker with previous groups.
@@ -25,27 +44,127 @@ class GroupChecker:
             previous_groups: List of previous groups, where each group is a list of student names
         """
         self.previous_groups = previous_groups
-        self.previous_pairs = self._build_pair_set(previous_groups)
-        self.previous_students = self._get_all_students(previous_groups)
+        groups = self._unique_groups(previous_groups)
+
+        # Student names are interned to small integer IDs so pairs can be
+        # stored and looked up as plain ints instead of tuples of strings.
+        # Only one of _pairs and _adj is built; the other is None
+        students = dict.fromkeys(chain.from_iterable(groups))
+        self._id = {student: i for i, student in enumerate(students)}
+        self.previous_students = set(self._id)
+        if self._use_bitsets(groups):
+            self._pairs = None
+            self._adj = self._build_adjacency(groups)
+        else:
+            self._pairs = self._build_pair_set(groups)
+            self._adj = None
+
+    @property
+    def previous_pairs(self) -> Set[Tuple[str, str]]:
+        """
+        Every pair of students who have previously been in a group together.
+
+        The checker does not keep pairs of names itself, so this set is built
+        from its index of student IDs each time it is read.
+
+        Returns:
+            Set of (student1, student2) tuples, each with the names in sorted order
+        """
+        names = list(self._id)
+        if self._adj is None:
+            id_pairs = ((key >> 32, key & 0xFFFFFFFF) for key in self._pairs)
+        else:
+            # bin() lists the bits most significant first, so reverse it to
+            # line each student up with their bit
+            id_pairs = ((a, b)
+                        for a, partners in enumerate(self._adj)
+                        for b, bit in enumerate(bin(partners)[:1:-1])
+                        if bit == '1' and b > a)
+        pairs = set()
+        for a, b in id_pairs:
+            student1, student2 = names[a], names[b]
+            pairs.add((student1, student2) if student1 < student2 else (student2, student1))
+        return pairs
 
-    def _build_pair_set(self, groups: List[List[str]]) -> Set[Tuple[str, str]]:
+    def _unique_groups(self, groups: List[List[str]]) -> List[List[str]]:
         """
-        Build a set of all student pairs from groups.
+        Drop repeated groups, and repeated names within a group.
+
+        Repeats add no new pairs, and a name listed twice in one group would
+        otherwise be recorded as having been in a group with itself.
 
         Args:
             groups: List of groups
 
         Returns:
-            Set of tuples representing student pairs (normalized to alphabetical order)
+            List of groups where no two groups have the same members and no group
+            names a student twice
         """
-        pairs = set()
+        seen = set()
+        unique = []
         for group in groups:
-            # Generate all pairs of students in this group
-            for student1, student2 in combinations(group, 2):
-                # Normalize pair order (alphabetically) for consistent comparison
-                pair = tuple(sorted([student1, student2]))
-                pairs.add(pair)
-        return pairs
+            members = frozenset(group)
+            if members in seen:
+                continue
+            seen.add(members)
+            unique.append(group if len(members) == len(group) else list(dict.fromkeys(group)))
+        return unique
+
+    def _use_bitsets(self, groups: List[List[str]]) -> bool:
+        """
+        Decide whether to index the previous groups as bitsets rather than pairs.
+
+        Args:
+            groups: List of groups, with student IDs already assigned
+
+        Returns:
+            True when the roster is small enough and the groups large enough for
+            the bitsets to be faster to build and check than the pair set
+        """
+        return (len(self._id) <= self.BITSET_MAX_STUDENTS
+                and sum(map(len, groups)) >= self.BITSET_MIN_GROUP_SIZE * len(groups))
+
+    def _build_pair_set(self, groups: List[List[str]]) -> Set[int]:
+        """
+        Build the set of every pair of students who have been in a group together.
+
+        Args:
+            groups: List of groups, with student IDs already assigned
+
+        Returns:
+            Set of integer pair keys, each encoded as ``(low_id << 32) | high_id``
+        """
+        ids = self._id
+        # A single set comprehension feeds every pair straight into the set, with
+        # each group translated to IDs as it is reached and each pair ordered by
+        # one comparison rather than sorting
+        return {
+            a << 32 | b if a < b else b << 32 | a
+            for group in groups
+            for a, b in combinations([ids[student] for student in group], 2)
+        }
+
+    def _build_adjacency(self, groups: List[List[str]]) -> List[int]:
+        """
+        Build a bitset of previous partners for every student.
+
+        Args:
+            groups: List of groups
+
+        Returns:
+            List indexed by student ID, where bit ``j`` of an entry is set when that
+            student has previously been in a group with the student whose ID is ``j``
+        """
+        ids = self._id
+        adj = [0] * len(ids)
+        for group in groups:
+            members = [ids[student] for student in group]
+            mask = 0
+            for a in members:
+                mask |= 1 << a
+            for a in members:
+                adj[a] |= mask & ~(1 << a)
+        return adj
 
     def _get_all_students(self, groups: List[List[str]]) -> Set[str]:
         """
@@ -66,56 +185,145 @@ class GroupChecker:
         """
         Check proposed groups for conflicts with previous groups.
 
+        Use analyze() instead when missing students are also needed, so the
+        proposed groups are only walked once.
+
         Args:
             proposed_groups: List of proposed groups to check
 
         Returns:
-            List of conflict dictionaries containing group index and conflicting pairs
+            List of conflict dictionaries containing group index, group members and
+            conflicting pairs, each pair a tuple of two names in group order
         """
-        conflicts = []
+        return list(self.iter_conflicts(proposed_groups))
+
+    def analyze(self, proposed_groups: Iterable[List[str]],
+                top_n: Optional[int] = None) -> Tuple[List[dict], List[str]]:
+        """
+        Check proposed groups for conflicts and missing students in a single pass.
+
+        Args:
+            proposed_groups: List (or any iterable) of proposed groups to check
+            top_n: If given, only return this many missing students
+
+        Returns:
+            Tuple of (conflicts, missing students), in the same form as returned by
+            check_proposed_groups() and find_missing_students()
+        """
+        if not self.previous_students:
+            return list(self.iter_conflicts(proposed_groups)), []
+
+        seen = set()
+        conflicts = list(self.iter_conflicts(proposed_groups, seen))
+        return conflicts, _smallest_names(self.previous_students - seen, top_n)
+
+    def iter_conflicts(self, proposed_groups: Iterable[List[str]],
+                       seen: Optional[Set[str]] = None) -> Iterator[dict]:
+        """
+        Lazily check proposed groups, yielding each conflicting group as it is found.
+
+        Args:
+            proposed_groups: List (or any iterable) of proposed groups to check
+            seen: Optional set that is updated with every proposed student, so missing
+                students can be worked out once the groups are exhausted
+
+        Yields:
+            Conflict dictionaries in the same form as returned by check_proposed_groups()
+        """
+        # Bind loop invariants to locals so the inner loop avoids attribute lookups
+        ids = self._id
+        previous_pairs = self._pairs
+        adj = self._adj
+
+        if not (previous_pairs or adj and any(adj)):
+            # Nothing can conflict, so only the proposed students are still needed
+            if seen is not None:
+                for group in proposed_groups:
+                    seen.update(group)
+            return
 
         for group_idx, group in enumerate(proposed_groups):
-            group_conflicts = []
-
-            # Check all pairs in this proposed group
-            for student1, student2 in combinations(group, 2):
-                pair = tuple(sorted([student1, student2]))
-                if pair in self.previous_pairs:
-                    group_conflicts.append({
-                        'students': [student1, student2],
-                        'pair': pair
-                    })
-
-            if group_conflicts:
-                conflicts.append({
+            conflicting = []
+            if seen is not None:
+                seen.update(group)
+
+            # Translate the group once; students never seen before cannot conflict
+            members = [(ids[student], student) for student in group if student in ids]
+
+            if adj is not None:
+                # AND each member's previous partners against the whole group and
+                # only look for the partners' names when some bit survives
+                mask = 0
+                for a, _ in members:
+                    mask |= 1 << a
+                for i, (a, student1) in enumerate(members):
+                    hits = adj[a] & mask
+                    if hits:
+                        for b, student2 in members[i + 1:]:
+                            if hits >> b & 1:
+                                conflicting.append((student1, student2))
+            else:
+                # Check all pairs in this proposed group
+                for (a, student1), (b, student2) in combinations(members, 2):
+                    key = a << 32 | b if a < b else b << 32 | a
+                    if key in previous_pairs:
+                        conflicting.append((student1, student2))
+
+            if conflicting:
+                yield {
                     'group_index': group_idx,
                     'group_members': group,
-                    'conflicts': group_conflicts
-                })
+                    'conflicts': conflicting
+                }
 
-        return conflicts
-
-    def find_missing_students(self, proposed_groups: List[List[str]]) -> List[str]:
+    def find_missing_students(self, proposed_groups: List[List[str]],
+                              top_n: Optional[int] = None) -> List[str]:
         """
         Find students from previous groups who are not in any proposed group.
 
+        Use analyze() instead when conflicts are also needed, so the proposed
+        groups are only walked once.
+
         Args:
             proposed_groups: List of proposed groups to check
+            top_n: If given, only return the first this many missing students
 
         Returns:
             Sorted list of student names that appear in previous but not proposed groups
         """
+        if not self.previous_students:
+            return []
+
         proposed_students = self._get_all_students(proposed_groups)
         missing = self.previous_students - proposed_students
-        return sorted(missing)
+        return _smallest_names(missing, top_n)
+
+
+def _smallest_names(names: Set[str], top_n: Optional[int] = None) -> List[str]:
+    """
+    Sort names, optionally keeping only the first few.
 
+    Args:
+        names: Set of names to sort
+        top_n: If given, only return this many names
 
-def load_groups_from_file(filepath: str) -> List[List[str]]:
+    Returns:
+        The names in sorted order, or the first top_n of them; a partial heap
+        selection is used instead of a full sort when only a few are wanted
+    """
+    if top_n is None or top_n >= len(names):
+        return sorted(names)
+    return heapq.nsmallest(top_n, names)
+
+
+def load_groups_from_file(filepath: str, cache: bool = False) -> List[List[str]]:
     """
     Load groups from a JSON file.
 
     Args:
         filepath: Path to the JSON file containing groups
+        cache: If True, reuse a pickled copy of the parsed groups stored next to
+            the file as ``<filepath>.pkl.cache``, refreshing it when the file changes
 
     Returns:
         List of groups
@@ -125,61 +333,380 @@ def load_groups_from_file(filepath: str) -> List[List[str]]:
         json.JSONDecodeError: If the file is not valid JSON
         ValueError: If the JSON structure is invalid
     """
-    path = Path(filepath)
-    if not path.exists():
-        raise FileNotFoundError(f"File not found: {filepath}")
+    if cache:
+        return _load_groups_cached(filepath)
+
+    # Open the file directly rather than stat-ing it first
+    try:
+        fp = open(filepath, 'rb')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {filepath}") from None
+    with fp:
+        return _parse_groups(fp, filepath)
 
-    with open(path, 'r') as f:
-        data = json.load(f)
+
+def _parse_groups(fp: IO, source: str = '<stream>') -> List[List[str]]:
+    """
+    Parse and validate groups from an open JSON file.
+
+    Args:
+        fp: Binary or text file object positioned at the start of the JSON document
+        source: Name of the file, used in error messages
+
+    Returns:
+        List of groups
+
+    Raises:
+        json.JSONDecodeError: If the file is not valid JSON
+        ValueError: If the JSON structure is invalid
+    """
+    # Read everything in one go; json.loads accepts raw bytes directly,
+    # skipping the text-mode decode layer for binary files
+    data = json.loads(fp.read())
 
     if not isinstance(data, list):
-        raise ValueError(f"Expected a list of groups in {filepath}")
+        raise ValueError(f"Expected a list of groups in {source}")
 
+    # The json module only produces exact built-in types, so comparing type()
+    # results is enough, and mapping type() over a group runs entirely in C
+    member_types = {str}
     for i, group in enumerate(data):
-        if not isinstance(group, list):
-            raise ValueError(f"Group {i} in {filepath} is not a list")
-        if not all(isinstance(member, str) for member in group):
-            raise ValueError(f"All group members in {filepath} must be strings")
+        if type(group) is not list:
+            raise ValueError(f"Group {i} in {source} is not a list")
+        if not member_types.issuperset(map(type, group)):
+            raise ValueError(f"All group members in {source} must be strings")
 
     return data
 
 
-def print_report(conflicts: List[dict], missing_students: List[str]) -> None:
+def _load_groups_cached(filepath: str) -> List[List[str]]:
     """
-    Print a detailed report of conflicts and missing students.
+    Load groups through the on-disk pickle cache kept next to the JSON file.
+
+    The cache is keyed by the JSON file's modification time and size, so any
+    edit to the file causes it to be parsed and validated again. Failing to
+    read or write the cache is never an error; the JSON file is used instead.
+
+    Args:
+        filepath: Path to the JSON file containing groups
+
+    Returns:
+        List of groups
+    """
+    try:
+        st = os.stat(filepath)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {filepath}") from None
+    stamp = (st.st_mtime_ns, st.st_size)
+    cache_path = Path(str(filepath) + '.pkl.cache')
+
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+    except Exception:
+        # A missing, truncated or corrupt cache can fail to unpickle in almost
+        # any way, and only means the JSON file has to be parsed again
+        cached = None
+    if (type(cached) is tuple and len(cached) == 2 and cached[0] == stamp
+            and type(cached[1]) is list):
+        return cached[1]
+
+    data = load_groups_from_file(filepath)
+
+    # Write to a temporary file next to the cache and move it into place, so
+    # a concurrent run never reads a half-written cache
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix=cache_path.name[:-len('pkl.cache')],
+                                        suffix='.pkl.cache', dir=cache_path.parent)
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((stamp, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    return data
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_checker(filepath: str, dev: int, ino: int, mtime_ns: int, size: int) -> GroupChecker:
+    """Build a GroupChecker for a file; memoized on the file's identity and stamp."""
+    return GroupChecker(load_groups_from_file(filepath))
+
+
+def get_checker(filepath: str) -> GroupChecker:
+    """
+    Get a GroupChecker for a previous groups file, reusing one built earlier.
+
+    Checkers are memoized by the file's resolved path, device and inode,
+    modification time and size, so library code that checks many proposals
+    against the same file only loads and indexes it once, an edited file is
+    picked up automatically, and a relative path is never mistaken for a
+    same-named file in another working directory. The returned checker is
+    shared between callers and must not be modified. The command-line tool
+    runs once per process and builds its checker directly.
+
+    Args:
+        filepath: Path to the JSON file containing previous groups
+
+    Returns:
+        GroupChecker for the groups in the file
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        json.JSONDecodeError: If the file is not valid JSON
+        ValueError: If the JSON structure is invalid
+    """
+    try:
+        st = os.stat(filepath)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {filepath}") from None
+    return _cached_checker(os.path.realpath(filepath), st.st_dev, st.st_ino,
+                           st.st_mtime_ns, st.st_size)
+
+
+def _detect_encoding(head: bytes) -> str:
+    """
+    Work out the encoding of a JSON file from its first four bytes.
+
+    Follows the rules json.loads applies to bytes: a byte order mark if there is
+    one, otherwise the pattern of zero bytes around the first ASCII character.
+
+    Args:
+        head: Up to the first four bytes of the file
+
+    Returns:
+        Name of the codec to decode the file with
+    """
+    if head.startswith((codecs.BOM_UTF32_BE, codecs.BOM_UTF32_LE)):
+        return 'utf-32'
+    if head.startswith((codecs.BOM_UTF16_BE, codecs.BOM_UTF16_LE)):
+        return 'utf-16'
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if len(head) >= 4:
+        if not head[0]:
+            return 'utf-16-be' if head[1] else 'utf-32-be'
+        if not head[1]:
+            return 'utf-16-le' if head[2] or head[3] else 'utf-32-le'
+    elif len(head) == 2:
+        if not head[0]:
+            return 'utf-16-be'
+        if not head[1]:
+            return 'utf-16-le'
+    return 'utf-8'
+
+
+# Insignificant whitespace between JSON tokens
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def iter_groups_from_file(filepath: str, chunk_size: int = 65536) -> Iterator[List[str]]:
+    """
+    Lazily load groups from a JSON file, one group at a time.
+
+    Only the group being decoded and about one chunk of the file are held in
+    memory, so very large files can be checked without loading them fully.
+    Groups are validated as they are read, so an error may be raised after
+    earlier groups have already been yielded.
+
+    Args:
+        filepath: Path to the JSON file containing groups
+        chunk_size: Number of characters to read from the file at a time
+
+    Yields:
+        Each group in the file, in order
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        json.JSONDecodeError: If the file is not valid JSON
+        ValueError: If the JSON structure is invalid
+    """
+    try:
+        raw = open(filepath, 'rb')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {filepath}") from None
+
+    # Pick the encoding from the first bytes the same way json.loads does, so
+    # both loaders accept UTF-8 (with or without a BOM), UTF-16 and UTF-32
+    encoding = _detect_encoding(raw.read(4))
+    raw.seek(0)
+
+    decoder = json.JSONDecoder()
+    member_types = {str}
+    with io.TextIOWrapper(raw, encoding=encoding) as f:
+        buf = ''
+        pos = 0
+        eof = False
+        # Where we are in the top-level list: 'start' (before the '['),
+        # 'first' (before the first group), 'next' (after a group),
+        # 'group' (after a comma) or 'end' (after the closing ']')
+        state = 'start'
+        i = 0
+
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos == len(buf):
+                if not eof:
+                    buf = f.read(chunk_size)
+                    pos = 0
+                    eof = not buf
+                    continue
+                if state != 'end':
+                    raise json.JSONDecodeError("Expecting value", buf, pos)
+                return
+
+            ch = buf[pos]
+            if state == 'start':
+                if ch != '[':
+                    # Like load_groups_from_file, only complain about the structure
+                    # once the whole file has parsed as some other JSON value
+                    json.loads(buf[pos:] + f.read())
+                    raise ValueError(f"Expected a list of groups in {filepath}")
+                pos += 1
+                state = 'first'
+            elif state == 'end':
+                raise json.JSONDecodeError("Extra data", buf, pos)
+            elif ch == ']' and state != 'group':
+                pos += 1
+                state = 'end'
+            elif state == 'next':
+                if ch != ',':
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+                pos += 1
+                state = 'group'
+            else:
+                start = pos
+                try:
+                    group, pos = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    # The group may just be cut off at the end of the buffer
+                    if eof:
+                        raise
+                    chunk = f.read(chunk_size)
+                    buf = buf[pos:] + chunk
+                    pos = 0
+                    eof = not chunk
+                    continue
+
+                error = None
+                if type(group) is not list:
+                    error = f"Group {i} in {filepath} is not a list"
+                elif not member_types.issuperset(map(type, group)):
+                    error = f"All group members in {filepath} must be strings"
+                if error:
+                    # Everything before this group was valid, so the file is valid
+                    # JSON only if a list of the rest of it is; check that first so
+                    # invalid JSON is reported the same way as by a full load
+                    json.loads('[' + buf[start:] + f.read())
+                    raise ValueError(error)
+                yield group
+                state = 'next'
+                i += 1
+
+
+def _conflicts_for_json(conflicts: List[dict]) -> List[dict]:
+    """
+    Expand conflicts into the form used by the JSON output.
 
     Args:
         conflicts: List of conflicts found
-        missing_students: List of students from previous groups not in proposed groups
+
+    Returns:
+        Copies of the conflicts where each pair is a dictionary with the students
+        in group order under 'students' and in alphabetical order under 'pair'
     """
-    has_issues = conflicts or missing_students
+    return [
+        {
+            'group_index': conflict['group_index'],
+            'group_members': conflict['group_members'],
+            'conflicts': [
+                {
+                    'students': [student1, student2],
+                    'pair': (student1, student2) if student1 < student2 else (student2, student1)
+                }
+                for student1, student2 in conflict['conflicts']
+            ]
+        }
+        for conflict in conflicts
+    ]
+
+
+def _conflict_lines(conflict: dict) -> List[str]:
+    """
+    Format the details of a single conflicting proposed group.
 
-    if not has_issues:
-        print("✓ No conflicts found! All proposed groups have novel member combinations.")
-        print("✓ All students from previous groups are included in proposed groups.")
-        return
+    Args:
+        conflict: Conflict dictionary as returned by GroupChecker
 
-    if conflicts:
-        print(f"✗ Found conflicts in {len(conflicts)} proposed group(s):\n")
+    Returns:
+        Newline-terminated report lines for the group
+    """
+    group_idx = conflict['group_index']
+    group_members = conflict['group_members']
 
-        for conflict in conflicts:
-            group_idx = conflict['group_index']
-            group_members = conflict['group_members']
+    lines = [f"Group {group_idx + 1}: {group_members}\n", "  Conflicts:\n"]
+    for student1, student2 in conflict['conflicts']:
+        lines.append(f"    - {student1} and {student2} have previously been in a group together\n")
+    lines.append("\n")
+    return lines
 
-            print(f"Group {group_idx + 1}: {group_members}")
-            print(f"  Conflicts:")
 
-            for conf in conflict['conflicts']:
-                student1, student2 = conf['students']
-                print(f"    - {student1} and {student2} have previously been in a group together")
+def print_conflict(conflict: dict) -> None:
+    """
+    Print the details of a single conflicting proposed group.
+
+    Args:
+        conflict: Conflict dictionary as returned by GroupChecker
+    """
+    sys.stdout.write(''.join(_conflict_lines(conflict)))
 
-            print()
 
-    if missing_students:
-        print(f"⚠ Warning: {len(missing_students)} student(s) from previous groups are missing from proposed groups:\n")
+def print_report(conflicts: List[dict], missing_students: List[str],
+                 conflicts_printed: bool = False, num_missing: Optional[int] = None) -> None:
+    """
+    Print a detailed report of conflicts and missing students.
+
+    The report is assembled in memory and written with a single call, rather
+    than one write per line.
+
+    Args:
+        conflicts: List of conflicts found
+        missing_students: List of students from previous groups not in proposed groups
+        conflicts_printed: If True, the conflicting groups have already been printed
+            one by one with print_conflict(), so only a summary line is printed for them
+        num_missing: Total number of missing students, when missing_students only
+            lists some of them
+    """
+    if num_missing is None:
+        num_missing = len(missing_students)
+    out = []
+
+    if not conflicts and not num_missing:
+        out.append("✓ No conflicts found! All proposed groups have novel member combinations.\n")
+        out.append("✓ All students from previous groups are included in proposed groups.\n")
+
+    if conflicts and conflicts_printed:
+        out.append(f"✗ Found conflicts in {len(conflicts)} proposed group(s).\n\n")
+    elif conflicts:
+        out.append(f"✗ Found conflicts in {len(conflicts)} proposed group(s):\n\n")
+
+        for conflict in conflicts:
+            out.extend(_conflict_lines(conflict))
+
+    if num_missing:
+        out.append(f"⚠ Warning: {num_missing} student(s) from previous groups are missing from proposed groups:\n\n")
         for student in missing_students:
-            print(f"  - {student}")
-        print()
+            out.append(f"  - {student}\n")
+        if num_missing > len(missing_students):
+            out.append(f"  ... and {num_missing - len(missing_students)} more\n")
+        out.append("\n")
+
+    sys.stdout.write(''.join(out))
 
 
 def main():
@@ -223,43 +750,86 @@ Input file format (JSON):
         help='Output results in JSON format'
     )
 
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Cache parsed input files next to them (<file>.pkl.cache) to speed up repeated runs'
+    )
+
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Read the proposed groups file incrementally and report conflicts as they are found'
+    )
+
+    parser.add_argument(
+        '--max-missing',
+        type=int,
+        metavar='N',
+        help='List at most N missing students (the total count is still reported)'
+    )
+
     args = parser.parse_args()
+    if args.max_missing is not None and args.max_missing < 0:
+        parser.error('--max-missing must not be negative')
 
     try:
         # Load groups from files
         if args.verbose:
             print(f"Loading previous groups from: {args.previous_groups}")
-        previous_groups = load_groups_from_file(args.previous_groups)
+        previous_groups = load_groups_from_file(args.previous_groups, cache=args.cache)
 
         if args.verbose:
             print(f"Loading proposed groups from: {args.proposed_groups}")
-        proposed_groups = load_groups_from_file(args.proposed_groups)
+        if args.stream:
+            proposed_groups = iter_groups_from_file(args.proposed_groups)
+        else:
+            proposed_groups = load_groups_from_file(args.proposed_groups, cache=args.cache)
 
         if args.verbose:
             print(f"Loaded {len(previous_groups)} previous group(s)")
-            print(f"Loaded {len(proposed_groups)} proposed group(s)")
+            if not args.stream:
+                print(f"Loaded {len(proposed_groups)} proposed group(s)")
             print()
 
         # Check for conflicts and missing students
         checker = GroupChecker(previous_groups)
-        conflicts = checker.check_proposed_groups(proposed_groups)
-        missing_students = checker.find_missing_students(proposed_groups)
+        seen = set()
+        conflicts = []
+        for conflict in checker.iter_conflicts(proposed_groups, seen):
+            if args.stream and not args.json:
+                # Report each conflicting group as soon as it has been read
+                print_conflict(conflict)
+            conflicts.append(conflict)
+        missing = checker.previous_students - seen
+        missing_students = _smallest_names(missing, args.max_missing)
 
         # Output results
         if args.json:
             result = {
                 'has_conflicts': len(conflicts) > 0,
                 'num_conflicts': len(conflicts),
-                'conflicts': conflicts,
+                'conflicts': _conflicts_for_json(conflicts),
                 'missing_students': missing_students,
-                'num_missing': len(missing_students)
+                'num_missing': len(missing)
             }
-            print(json.dumps(result, indent=2))
+            # Names are written as-is rather than \u-escaped, which is cheaper
+            # for non-ASCII rosters and keeps them readable. The bytes are always
+            # UTF-8, as JSON requires, whatever encoding the console uses
+            output = json.dumps(result, indent=2, ensure_ascii=False) + '\n'
+            stdout = getattr(sys.stdout, 'buffer', None)
+            if stdout is None:
+                sys.stdout.write(output)
+            else:
+                sys.stdout.flush()
+                stdout.write(output.encode('utf-8'))
+                stdout.flush()
         else:
-            print_report(conflicts, missing_students)
+            print_report(conflicts, missing_students, conflicts_printed=args.stream,
+                         num_missing=len(missing))
 
         # Exit with appropriate code
-        sys.exit(1 if (conflicts or missing_students) else 0)
+        sys.exit(1 if (conflicts or missing) else 0)
 
     except FileNotFoundError as e:
         print(f"Error: {e}", file=sys.stderr)
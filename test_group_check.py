@@ -4,163 +4,220 @@ Unit tests for the Student Group Conflict Checker
 """
 
 import unittest
+import contextlib
+import functools
+import io
 import json
 import tempfile
 import os
+import pickle
+import sys
 from pathlib import Path
-from group_check import GroupChecker, load_groups_from_file
+from unittest import mock
+from group_check import (GroupChecker, _conflicts_for_json, _parse_groups, get_checker,
+                         iter_groups_from_file, load_groups_from_file, main, print_conflict,
+                         print_report)
+
+# Sample input files shipped alongside the tests
+EXAMPLES = Path(__file__).resolve().parent / 'examples'
+
+# Well-formed JSON that is not a list of groups of names, and the error it raises
+BAD_STRUCTURES = [
+    ({"groups": [["Alice", "Bob"]]}, ValueError),        # Not a list
+    ([["Alice", "Bob"], "Invalid Group"], ValueError),   # Group is not a list
+    ([["Alice", "Bob"], [1, 2, 3]], ValueError),         # Numbers instead of strings
+]
+
+# Previous groups shared by tests across the module
+PREV_AB = [
+    ["Alice", "Bob"]
+]
+PREV_ABC = [
+    ["Alice", "Bob", "Charlie"]
+]
+PREV_ABC_DEF = [
+    ["Alice", "Bob", "Charlie"],
+    ["David", "Eve", "Frank"]
+]
+
+# (name, previous groups, proposed groups, [(group index, conflicting pairs), ...])
+CHECK_CASES = [
+    ("no conflicts", PREV_ABC_DEF,
+     [["Alice", "David", "Grace"], ["Bob", "Eve", "Henry"]],
+     []),
+    ("single conflict", PREV_ABC,
+     [["Alice", "Bob", "David"]],
+     [(0, {frozenset(("Alice", "Bob"))})]),
+    ("multiple conflicts in one group",
+     [["Alice", "Bob", "Charlie"], ["Alice", "David", "Eve"]],
+     [["Alice", "Bob", "David"]],
+     [(0, {frozenset(("Alice", "Bob")), frozenset(("Alice", "David"))})]),
+    ("multiple groups with conflicts",
+     [["Alice", "Bob"], ["Charlie", "David"]],
+     [["Alice", "Bob", "Eve"], ["Charlie", "David", "Frank"]],
+     [(0, {frozenset(("Alice", "Bob"))}), (1, {frozenset(("Charlie", "David"))})]),
+    ("case-sensitive names", PREV_AB,
+     [["alice", "bob"]],                       # Different case, should not conflict
+     []),
+    ("empty previous groups", [],
+     [["Alice", "Bob", "Charlie"]],
+     []),
+    ("empty proposed groups", PREV_ABC,
+     [],
+     []),
+    ("large groups",
+     [["Alice", "Bob", "Charlie", "David", "Eve"]],
+     [["Alice", "Frank", "Grace"], ["Bob", "Charlie", "Henry"]],
+     [(1, {frozenset(("Bob", "Charlie"))})]),
+    ("pair normalization", PREV_AB,
+     [["Bob", "Alice"]],                       # Same pair, different order
+     [(0, {frozenset(("Alice", "Bob"))})]),
+]
+
+# Tests that read or write real files; set GROUP_CHECK_SKIP_IO=1 to leave them out
+io_test = unittest.skipIf(os.environ.get('GROUP_CHECK_SKIP_IO') == '1',
+                          'GROUP_CHECK_SKIP_IO=1')
+
+
+@functools.lru_cache(maxsize=None)
+def _checker(previous_groups):
+    return GroupChecker([list(group) for group in previous_groups])
+
+
+def checker_for(previous_groups):
+    """Return the shared checker for these previous groups, building it on first use."""
+    return _checker(tuple(tuple(group) for group in previous_groups))
+
+
+class PairSetChecker(GroupChecker):
+    """GroupChecker that always uses the pair-set lookup instead of bitsets."""
+
+    BITSET_MAX_STUDENTS = 0
+
+
+class BitsetChecker(GroupChecker):
+    """GroupChecker that uses bitsets for small rosters whatever the group size."""
+
+    BITSET_MIN_GROUP_SIZE = 0
+
+
+def tearDownModule():
+    """Drop the shared checkers once the module's tests have run."""
+    _checker.cache_clear()
+
+
+def compact_json(data):
+    """Serialize fixture data without the optional spaces after separators."""
+    return json.dumps(data, separators=(',', ':'))
+
+
+def json_bytes(data):
+    """Encode fixture data as compact UTF-8 JSON, ready for a binary write."""
+    return compact_json(data).encode('utf-8')
+
+
+def write_fixtures(directory, fixtures):
+    """Write each named fixture text to ``<name>.json`` and return the paths by name."""
+    paths = {}
+    for name, text in fixtures.items():
+        paths[name] = directory / (name + '.json')
+        paths[name].write_bytes(text.encode('utf-8'))
+    return paths
+
+
+def pair_set(conflict):
+    """Return a conflict's pairs as order-independent sets of names."""
+    return {frozenset(pair) for pair in conflict['conflicts']}
 
 
 class TestGroupChecker(unittest.TestCase):
     """Test cases for the GroupChecker class."""
 
-    def test_no_conflicts(self):
-        """Test case where there are no conflicts."""
-        previous_groups = [
-            ["Alice", "Bob", "Charlie"],
-            ["David", "Eve", "Frank"]
-        ]
-        proposed_groups = [
-            ["Alice", "David", "Grace"],
-            ["Bob", "Eve", "Henry"]
-        ]
+    def test_check_proposed_groups(self):
+        """Test conflicts found for each case in CHECK_CASES."""
+        for name, previous_groups, proposed_groups, expected in CHECK_CASES:
+            with self.subTest(name):
+                conflicts = checker_for(previous_groups).check_proposed_groups(proposed_groups)
 
-        checker = GroupChecker(previous_groups)
-        conflicts = checker.check_proposed_groups(proposed_groups)
-
-        self.assertEqual(len(conflicts), 0)
+                self.assertEqual([(c['group_index'], pair_set(c)) for c in conflicts], expected)
 
-    def test_single_conflict(self):
-        """Test case with a single conflict."""
+    def test_no_previous_pairs(self):
+        """Test with previous groups that never put two students together."""
         previous_groups = [
-            ["Alice", "Bob", "Charlie"]
+            ["Alice"],
+            ["Bob"]
         ]
         proposed_groups = [
-            ["Alice", "Bob", "David"]
-        ]
-
-        checker = GroupChecker(previous_groups)
-        conflicts = checker.check_proposed_groups(proposed_groups)
-
-        self.assertEqual(len(conflicts), 1)
-        self.assertEqual(conflicts[0]['group_index'], 0)
-        self.assertEqual(len(conflicts[0]['conflicts']), 1)
-        self.assertIn('Alice', conflicts[0]['conflicts'][0]['students'])
-        self.assertIn('Bob', conflicts[0]['conflicts'][0]['students'])
-
-    def test_multiple_conflicts_in_one_group(self):
-        """Test case with multiple conflicts in a single proposed group."""
-        previous_groups = [
-            ["Alice", "Bob", "Charlie"],
-            ["Alice", "David", "Eve"]
-        ]
-        proposed_groups = [
-            ["Alice", "Bob", "David"]  # Alice-Bob and Alice-David both conflict
-        ]
-
-        checker = GroupChecker(previous_groups)
-        conflicts = checker.check_proposed_groups(proposed_groups)
-
-        self.assertEqual(len(conflicts), 1)
-        self.assertEqual(len(conflicts[0]['conflicts']), 2)
-
-    def test_multiple_groups_with_conflicts(self):
-        """Test case with conflicts in multiple proposed groups."""
-        previous_groups = [
-            ["Alice", "Bob"],
-            ["Charlie", "David"]
-        ]
-        proposed_groups = [
-            ["Alice", "Bob", "Eve"],
-            ["Charlie", "David", "Frank"]
-        ]
-
-        checker = GroupChecker(previous_groups)
-        conflicts = checker.check_proposed_groups(proposed_groups)
-
-        self.assertEqual(len(conflicts), 2)
-
-    def test_case_sensitive_names(self):
-        """Test that student names are case-sensitive."""
-        previous_groups = [
             ["Alice", "Bob"]
         ]
-        proposed_groups = [
-            ["alice", "bob"]  # Different case, should not conflict
-        ]
 
-        checker = GroupChecker(previous_groups)
-        conflicts = checker.check_proposed_groups(proposed_groups)
+        checker = checker_for(previous_groups)
+        conflicts, missing = checker.analyze(proposed_groups)
 
         self.assertEqual(len(conflicts), 0)
+        self.assertEqual(missing, [])
 
-    def test_empty_previous_groups(self):
-        """Test with no previous groups."""
-        previous_groups = []
+    def test_repeated_previous_groups_and_names(self):
+        """Test that repeated groups and names in previous groups are ignored."""
+        previous_groups = [
+            ["Alice", "Bob", "Alice"],
+            ["Bob", "Alice"],
+            ["Charlie"]
+        ]
         proposed_groups = [
-            ["Alice", "Bob", "Charlie"]
+            ["Alice", "Alice"],
+            ["Bob", "Alice", "Charlie"]
         ]
 
-        checker = GroupChecker(previous_groups)
-        conflicts = checker.check_proposed_groups(proposed_groups)
+        for checker_class in (BitsetChecker, PairSetChecker):
+            with self.subTest(checker_class=checker_class.__name__):
+                checker = checker_class(previous_groups)
+                conflicts = checker.check_proposed_groups(proposed_groups)
 
-        self.assertEqual(len(conflicts), 0)
+                self.assertEqual(len(conflicts), 1)
+                self.assertEqual(conflicts[0]['group_index'], 1)
+                self.assertEqual(conflicts[0]['conflicts'], [("Bob", "Alice")])
+                self.assertEqual(checker.previous_groups, previous_groups)
 
-    def test_empty_proposed_groups(self):
-        """Test with no proposed groups."""
+    def test_previous_pairs(self):
+        """Test that previous pairs are reported as sorted name tuples on both paths."""
         previous_groups = [
-            ["Alice", "Bob", "Charlie"]
+            ["Charlie", "Alice", "Bob"],
+            ["David", "Alice"],
+            ["Eve"]
         ]
-        proposed_groups = []
 
-        checker = GroupChecker(previous_groups)
-        conflicts = checker.check_proposed_groups(proposed_groups)
+        for checker_class in (BitsetChecker, PairSetChecker):
+            with self.subTest(checker_class=checker_class.__name__):
+                checker = checker_class(previous_groups)
 
-        self.assertEqual(len(conflicts), 0)
+                self.assertEqual(checker.previous_pairs, {
+                    ("Alice", "Bob"), ("Alice", "Charlie"), ("Bob", "Charlie"), ("Alice", "David")
+                })
 
-    def test_large_groups(self):
-        """Test with larger groups."""
+    def test_pair_set_matches_bitset(self):
+        """Test that large-roster pair lookups agree with the small-roster bitsets."""
         previous_groups = [
-            ["Alice", "Bob", "Charlie", "David", "Eve"]
-        ]
-        proposed_groups = [
-            ["Alice", "Frank", "Grace"],  # No conflict
-            ["Bob", "Charlie", "Henry"]   # Conflict: Bob-Charlie
-        ]
-
-        checker = GroupChecker(previous_groups)
-        conflicts = checker.check_proposed_groups(proposed_groups)
-
-        self.assertEqual(len(conflicts), 1)
-        self.assertEqual(conflicts[0]['group_index'], 1)
-
-    def test_pair_normalization(self):
-        """Test that pairs are normalized (order doesn't matter)."""
-        previous_groups = [
-            ["Alice", "Bob"]
+            ["Alice", "Bob", "Charlie"],
+            ["Alice", "David", "Eve"],
+            ["Frank", "Grace"]
         ]
         proposed_groups = [
-            ["Bob", "Alice"]  # Same pair, different order
+            ["Eve", "Bob", "Alice", "Henry"],
+            ["Grace", "Charlie", "Frank"],
+            ["David", "Iris"]
         ]
 
-        checker = GroupChecker(previous_groups)
-        conflicts = checker.check_proposed_groups(proposed_groups)
-
-        self.assertEqual(len(conflicts), 1)
-
+        bitset_conflicts = BitsetChecker(previous_groups).check_proposed_groups(proposed_groups)
+        pair_set_conflicts = PairSetChecker(previous_groups).check_proposed_groups(proposed_groups)
 
-class TestLoadGroupsFromFile(unittest.TestCase):
-    """Test cases for loading groups from JSON files."""
+        self.assertEqual(pair_set_conflicts, bitset_conflicts)
+        self.assertEqual(len(bitset_conflicts), 2)
+        self.assertEqual(len(bitset_conflicts[0]['conflicts']), 2)
 
-    def setUp(self):
-        """Create a temporary directory for test files."""
-        self.temp_dir = tempfile.mkdtemp()
 
-    def tearDown(self):
-        """Clean up temporary files."""
-        for file in Path(self.temp_dir).glob('*'):
-            file.unlink()
-        os.rmdir(self.temp_dir)
+class TestParseGroups(unittest.TestCase):
+    """Test cases for parsing groups from an open JSON stream."""
 
     def test_load_valid_file(self):
         """Test loading a valid JSON file."""
@@ -168,69 +225,241 @@ class TestLoadGroupsFromFile(unittest.TestCase):
             ["Alice", "Bob", "Charlie"],
             ["David", "Eve", "Frank"]
         ]
-        filepath = os.path.join(self.temp_dir, 'test.json')
 
-        with open(filepath, 'w') as f:
-            json.dump(data, f)
-
-        groups = load_groups_from_file(filepath)
+        groups = _parse_groups(io.StringIO(compact_json(data)))
         self.assertEqual(groups, data)
 
-    def test_load_nonexistent_file(self):
-        """Test loading a file that doesn't exist."""
-        filepath = os.path.join(self.temp_dir, 'nonexistent.json')
-
-        with self.assertRaises(FileNotFoundError):
-            load_groups_from_file(filepath)
-
     def test_load_invalid_json(self):
         """Test loading a file with invalid JSON."""
-        filepath = os.path.join(self.temp_dir, 'invalid.json')
-
-        with open(filepath, 'w') as f:
-            f.write("{ invalid json }")
-
         with self.assertRaises(json.JSONDecodeError):
-            load_groups_from_file(filepath)
-
-    def test_load_wrong_structure_not_list(self):
-        """Test loading a file with wrong structure (not a list)."""
-        data = {"groups": [["Alice", "Bob"]]}
-        filepath = os.path.join(self.temp_dir, 'wrong.json')
+            _parse_groups(io.StringIO("{ invalid json }"))
 
-        with open(filepath, 'w') as f:
-            json.dump(data, f)
+    def test_load_wrong_structure(self):
+        """Test loading files with the wrong structure."""
+        for data, exc in BAD_STRUCTURES:
+            with self.subTest(data=data), self.assertRaises(exc):
+                _parse_groups(io.StringIO(compact_json(data)))
 
-        with self.assertRaises(ValueError):
-            load_groups_from_file(filepath)
-
-    def test_load_wrong_structure_group_not_list(self):
-        """Test loading a file where a group is not a list."""
-        data = [
-            ["Alice", "Bob"],
-            "Invalid Group"
-        ]
-        filepath = os.path.join(self.temp_dir, 'wrong.json')
 
-        with open(filepath, 'w') as f:
-            json.dump(data, f)
+@io_test
+class TestLoadGroupsFromFile(unittest.TestCase):
+    """Test cases for loading groups from JSON files."""
 
-        with self.assertRaises(ValueError):
-            load_groups_from_file(filepath)
+    CACHED = [
+        ["Alice", "Bob", "Charlie"],
+        ["David", "Eve", "Frank"]
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        """Write every fixture file once into a directory shared by the class."""
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.tmp = Path(cls._tmp.name)
+        cls.missing = cls.tmp / 'nonexistent.json'
+        cls.paths = write_fixtures(cls.tmp, {
+            'cached': compact_json(cls.CACHED),
+            'stale_cache': compact_json([["Alice", "Bob"]]),
+            'corrupt_cache': compact_json(cls.CACHED),
+        })
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the temporary directory and everything in it."""
+        cls._tmp.cleanup()
 
-    def test_load_wrong_structure_non_string_members(self):
-        """Test loading a file with non-string group members."""
-        data = [
-            ["Alice", "Bob"],
-            [1, 2, 3]  # Numbers instead of strings
+    def test_load_nonexistent_file(self):
+        """Test loading a file that doesn't exist."""
+        with self.assertRaises(FileNotFoundError):
+            load_groups_from_file(str(self.missing))
+
+    def test_load_with_cache(self):
+        """Test that a cached load returns the same groups and writes the cache."""
+        filepath = self.paths['cached']
+
+        self.assertEqual(load_groups_from_file(str(filepath), cache=True), self.CACHED)
+        self.assertTrue(filepath.with_name(filepath.name + '.pkl.cache').exists())
+        self.assertEqual(load_groups_from_file(str(filepath), cache=True), self.CACHED)
+
+    def test_load_with_stale_cache(self):
+        """Test that the cache is refreshed when the JSON file changes."""
+        filepath = self.paths['stale_cache']
+        load_groups_from_file(str(filepath), cache=True)
+
+        data = [["Alice", "Bob"], ["Charlie", "David"]]
+        filepath.write_bytes(json_bytes(data))
+
+        self.assertEqual(load_groups_from_file(str(filepath), cache=True), data)
+
+    def test_load_with_corrupt_cache(self):
+        """Test that an unreadable or malformed cache falls back to the JSON file."""
+        filepath = self.paths['corrupt_cache']
+        cache_path = filepath.with_name(filepath.name + '.pkl.cache')
+        load_groups_from_file(str(filepath), cache=True)
+        valid = cache_path.read_bytes()
+        st = filepath.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        corrupt = [
+            b'',                                          # Empty
+            valid[:len(valid) // 2],                      # Half written
+            b'garbage',                                   # Not a pickle
+            b'cno_such_module\nthing\n.',                 # Unimportable global
+            pickle.dumps(self.CACHED),                    # Not a (stamp, groups) tuple
+            pickle.dumps((stamp, "not a list")),          # Groups of the wrong type
         ]
-        filepath = os.path.join(self.temp_dir, 'wrong.json')
-
-        with open(filepath, 'w') as f:
-            json.dump(data, f)
-
-        with self.assertRaises(ValueError):
-            load_groups_from_file(filepath)
+        for i in range(len(valid)):
+            flipped = bytearray(valid)
+            flipped[i] ^= 0xff
+            corrupt.append(bytes(flipped))                # Single byte flipped
+
+        for data in corrupt:
+            with self.subTest(data=data):
+                cache_path.write_bytes(data)
+
+                self.assertEqual(load_groups_from_file(str(filepath), cache=True), self.CACHED)
+                self.assertEqual(cache_path.read_bytes(), valid)
+
+
+@io_test
+class TestIterGroupsFromFile(unittest.TestCase):
+    """Test cases for lazily loading groups from JSON files."""
+
+    VALID = [
+        ["Alice", "Bob", "Charlie"],
+        [],
+        ["David", "Eve \"Jr\"", "Frank"]
+    ]
+    ENCODINGS = ['utf-8-sig', 'utf-16', 'utf-16-le', 'utf-16-be',
+                 'utf-32', 'utf-32-le', 'utf-32-be']
+    INVALID_JSON = ['', 'x', '{ invalid json }', 'tru', '"abc', '[1', '[["Alice"], 1, x]',
+                    '[["Alice", "Bob"]', '[["Alice"] ["Bob"]]', '[["Alice"]] x']
+
+    @classmethod
+    def setUpClass(cls):
+        """Write every fixture file once into a directory shared by the class."""
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.tmp = Path(cls._tmp.name)
+        cls.missing = cls.tmp / 'nonexistent.json'
+        fixtures = {
+            'valid': json.dumps(cls.VALID, indent=2),
+            'empty': "[ ]",
+        }
+        for i, text in enumerate(cls.INVALID_JSON):
+            fixtures[f'invalid_{i}'] = text
+        for i, (data, _) in enumerate(BAD_STRUCTURES):
+            fixtures[f'wrong_{i}'] = compact_json(data)
+        cls.paths = write_fixtures(cls.tmp, fixtures)
+        for encoding in cls.ENCODINGS:
+            cls.paths[encoding] = cls.tmp / (encoding + '.json')
+            cls.paths[encoding].write_bytes(compact_json(cls.VALID).encode(encoding))
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the temporary directory and everything in it."""
+        cls._tmp.cleanup()
+
+    def test_iter_valid_file(self):
+        """Test that streamed groups match a full load, even across small reads."""
+        filepath = str(self.paths['valid'])
+
+        self.assertEqual(list(iter_groups_from_file(filepath)), self.VALID)
+        self.assertEqual(list(iter_groups_from_file(filepath, chunk_size=3)), self.VALID)
+
+    def test_iter_encodings(self):
+        """Test that streaming accepts the same encodings as a full load."""
+        for encoding in self.ENCODINGS:
+            with self.subTest(encoding=encoding):
+                filepath = str(self.paths[encoding])
+
+                self.assertEqual(load_groups_from_file(filepath), self.VALID)
+                self.assertEqual(list(iter_groups_from_file(filepath, chunk_size=3)), self.VALID)
+
+    def test_iter_empty_list(self):
+        """Test streaming a file with no groups."""
+        self.assertEqual(list(iter_groups_from_file(str(self.paths['empty']))), [])
+
+    def test_iter_nonexistent_file(self):
+        """Test streaming a file that doesn't exist."""
+        with self.assertRaises(FileNotFoundError):
+            list(iter_groups_from_file(str(self.missing)))
+
+    def test_iter_invalid_json(self):
+        """Test streaming and loading files with invalid JSON."""
+        for i, text in enumerate(self.INVALID_JSON):
+            filepath = str(self.paths[f'invalid_{i}'])
+            with self.subTest(text=text):
+                with self.assertRaises(json.JSONDecodeError):
+                    list(iter_groups_from_file(filepath, chunk_size=4))
+                with self.assertRaises(json.JSONDecodeError):
+                    load_groups_from_file(filepath)
+
+    def test_iter_wrong_structure(self):
+        """Test streaming files with the wrong structure."""
+        for i, (data, exc) in enumerate(BAD_STRUCTURES):
+            with self.subTest(data=data), self.assertRaises(exc):
+                list(iter_groups_from_file(str(self.paths[f'wrong_{i}'])))
+
+
+@io_test
+class TestGetChecker(unittest.TestCase):
+    """Test cases for reusing checkers built from files."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create one temporary directory shared by every test in the class."""
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.tmp = Path(cls._tmp.name)
+        cls.reused = cls.tmp / 'reused.json'
+        cls.rebuilt = cls.tmp / 'rebuilt.json'
+        cls.same_name = [cls.tmp / 'a' / 'same.json', cls.tmp / 'b' / 'same.json']
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the temporary directory and everything in it."""
+        cls._tmp.cleanup()
+
+    def test_checker_reused(self):
+        """Test that an unchanged file gives back the same checker."""
+        filepath = self.reused
+        filepath.write_bytes(json_bytes([["Alice", "Bob"]]))
+
+        checker = get_checker(str(filepath))
+        self.assertIs(get_checker(str(filepath)), checker)
+        self.assertEqual(len(checker.check_proposed_groups([["Bob", "Alice"]])), 1)
+
+    def test_relative_path_in_other_directory(self):
+        """Test that a relative path is not matched with a same-named file elsewhere."""
+        first, second = self.same_name
+        for filepath, groups in ((first, [["Alice", "Bob"]]), (second, [["Carla", "Dan"]])):
+            filepath.parent.mkdir()
+            filepath.write_bytes(json_bytes(groups))
+        # Same size and modification time, so only the location tells them apart
+        st = first.stat()
+        os.utime(second, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        cwd = os.getcwd()
+        try:
+            os.chdir(first.parent)
+            first_checker = get_checker('same.json')
+            os.chdir(second.parent)
+            second_checker = get_checker('same.json')
+        finally:
+            os.chdir(cwd)
+
+        self.assertIsNot(second_checker, first_checker)
+        self.assertEqual(second_checker.find_missing_students([]), ["Carla", "Dan"])
+
+    def test_checker_rebuilt_when_file_changes(self):
+        """Test that editing the file gives a fresh checker."""
+        filepath = self.rebuilt
+        filepath.write_bytes(json_bytes([["Alice", "Bob"]]))
+        checker = get_checker(str(filepath))
+
+        filepath.write_bytes(json_bytes([["Alice", "Bob"], ["Charlie", "David"]]))
+
+        self.assertIsNot(get_checker(str(filepath)), checker)
+        self.assertEqual(get_checker(str(filepath)).find_missing_students([]),
+                         ["Alice", "Bob", "Charlie", "David"])
 
 
 class TestMissingStudents(unittest.TestCase):
@@ -238,56 +467,39 @@ class TestMissingStudents(unittest.TestCase):
 
     def test_no_missing_students(self):
         """Test when all previous students are in proposed groups."""
-        previous_groups = [
-            ["Alice", "Bob", "Charlie"]
-        ]
         proposed_groups = [
             ["Alice", "David"],
             ["Bob", "Eve"],
             ["Charlie", "Frank"]
         ]
 
-        checker = GroupChecker(previous_groups)
+        checker = checker_for(PREV_ABC)
         missing = checker.find_missing_students(proposed_groups)
 
         self.assertEqual(len(missing), 0)
 
     def test_some_missing_students(self):
         """Test when some students are missing."""
-        previous_groups = [
-            ["Alice", "Bob", "Charlie"],
-            ["David", "Eve", "Frank"]
-        ]
         proposed_groups = [
             ["Alice", "Grace"],
             ["David", "Henry"]
         ]
 
-        checker = GroupChecker(previous_groups)
+        checker = checker_for(PREV_ABC_DEF)
         missing = checker.find_missing_students(proposed_groups)
 
-        self.assertEqual(len(missing), 4)
-        self.assertIn("Bob", missing)
-        self.assertIn("Charlie", missing)
-        self.assertIn("Eve", missing)
-        self.assertIn("Frank", missing)
+        self.assertEqual(missing, ["Bob", "Charlie", "Eve", "Frank"])
 
     def test_all_students_missing(self):
         """Test when all previous students are missing."""
-        previous_groups = [
-            ["Alice", "Bob", "Charlie"]
-        ]
         proposed_groups = [
             ["David", "Eve", "Frank"]
         ]
 
-        checker = GroupChecker(previous_groups)
+        checker = checker_for(PREV_ABC)
         missing = checker.find_missing_students(proposed_groups)
 
-        self.assertEqual(len(missing), 3)
-        self.assertIn("Alice", missing)
-        self.assertIn("Bob", missing)
-        self.assertIn("Charlie", missing)
+        self.assertEqual(missing, ["Alice", "Bob", "Charlie"])
 
     def test_missing_students_sorted(self):
         """Test that missing students are returned sorted."""
@@ -298,39 +510,196 @@ class TestMissingStudents(unittest.TestCase):
             ["David", "Eve"]
         ]
 
-        checker = GroupChecker(previous_groups)
+        checker = checker_for(previous_groups)
         missing = checker.find_missing_students(proposed_groups)
 
         self.assertEqual(missing, ["Alice", "Mike", "Zoe"])
 
     def test_empty_proposed_groups_all_missing(self):
         """Test with empty proposed groups."""
-        previous_groups = [
-            ["Alice", "Bob"]
-        ]
         proposed_groups = []
 
-        checker = GroupChecker(previous_groups)
+        checker = checker_for(PREV_AB)
         missing = checker.find_missing_students(proposed_groups)
 
         self.assertEqual(len(missing), 2)
 
     def test_case_sensitive_missing(self):
         """Test that case sensitivity applies to missing students."""
-        previous_groups = [
-            ["Alice", "Bob"]
-        ]
         proposed_groups = [
             ["alice", "bob"]  # Different case
         ]
 
-        checker = GroupChecker(previous_groups)
+        checker = checker_for(PREV_AB)
         missing = checker.find_missing_students(proposed_groups)
 
         # Alice and Bob should be missing because alice and bob are different
-        self.assertEqual(len(missing), 2)
-        self.assertIn("Alice", missing)
-        self.assertIn("Bob", missing)
+        self.assertEqual(missing, ["Alice", "Bob"])
+
+    def test_missing_students_top_n(self):
+        """Test limiting the number of missing students returned."""
+        previous_groups = [
+            ["Zoe", "Alice", "Mike"],
+            ["Bob", "Yara"]
+        ]
+        proposed_groups = [
+            ["David", "Eve"]
+        ]
+
+        checker = checker_for(previous_groups)
+
+        self.assertEqual(checker.find_missing_students(proposed_groups, top_n=2), ["Alice", "Bob"])
+        self.assertEqual(checker.find_missing_students(proposed_groups, top_n=10),
+                         ["Alice", "Bob", "Mike", "Yara", "Zoe"])
+        self.assertEqual(checker.analyze(proposed_groups, top_n=3)[1], ["Alice", "Bob", "Mike"])
+
+
+class TestAnalyze(unittest.TestCase):
+    """Test cases for checking conflicts and missing students in one pass."""
+
+    def test_matches_separate_checks(self):
+        """Test that analyze agrees with the individual check methods."""
+        proposed_groups = [
+            ["Alice", "Bob", "Grace"],
+            ["David", "Henry"]
+        ]
+
+        checker = checker_for(PREV_ABC_DEF)
+        conflicts, missing = checker.analyze(proposed_groups)
+
+        self.assertEqual(conflicts, checker.check_proposed_groups(proposed_groups))
+        self.assertEqual(missing, checker.find_missing_students(proposed_groups))
+        self.assertEqual(missing, ["Charlie", "Eve", "Frank"])
+
+    def test_single_use_iterable(self):
+        """Test that analyze only needs to iterate the proposed groups once."""
+        previous_groups = [
+            ["Alice", "Bob"],
+            ["Charlie", "David"]
+        ]
+        proposed_groups = iter([
+            ["Alice", "Bob"],
+            ["Charlie", "Eve"]
+        ])
+
+        checker = checker_for(previous_groups)
+        conflicts, missing = checker.analyze(proposed_groups)
+
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0]['group_index'], 0)
+        self.assertEqual(missing, ["David"])
+
+    def test_iter_conflicts_is_lazy(self):
+        """Test that conflicts are yielded before later groups are read."""
+        previous_groups = [
+            ["Alice", "Bob"]
+        ]
+
+        def proposed_groups():
+            yield ["Alice", "Bob"]
+            raise AssertionError("read past the first conflict")
+
+        checker = checker_for(previous_groups)
+        conflict = next(checker.iter_conflicts(proposed_groups()))
+
+        self.assertEqual(conflict['group_index'], 0)
+
+
+class TestReport(unittest.TestCase):
+    """Test cases for the printed and JSON reports."""
+
+    def test_streamed_conflicts_only_summarized(self):
+        """Test that conflicts already printed one by one are not printed again."""
+        conflicts = checker_for(PREV_AB).check_proposed_groups([["Bob", "Alice"]])
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            print_conflict(conflicts[0])
+            print_report(conflicts, [], conflicts_printed=True)
+
+        self.assertEqual(out.getvalue(),
+                         "Group 1: ['Bob', 'Alice']\n"
+                         "  Conflicts:\n"
+                         "    - Bob and Alice have previously been in a group together\n"
+                         "\n"
+                         "✗ Found conflicts in 1 proposed group(s).\n\n")
+
+    def test_missing_students_truncated(self):
+        """Test that the total missing count wins over the number of names listed."""
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            print_report([], ["Alice", "Bob"], num_missing=5)
+
+        self.assertEqual(out.getvalue(),
+                         "⚠ Warning: 5 student(s) from previous groups are missing from proposed groups:\n\n"
+                         "  - Alice\n"
+                         "  - Bob\n"
+                         "  ... and 3 more\n"
+                         "\n")
+
+    @io_test
+    def test_max_missing_zero(self):
+        """Test that --max-missing 0 lists no names but still reports and fails on them."""
+        argv = ['group_check.py', '--max-missing', '0',
+                str(EXAMPLES / 'previous_groups.json'),
+                str(EXAMPLES / 'proposed_groups_missing_students.json')]
+
+        out = io.StringIO()
+        with mock.patch.object(sys, 'argv', argv), contextlib.redirect_stdout(out), \
+                self.assertRaises(SystemExit) as cm:
+            main()
+
+        self.assertEqual(cm.exception.code, 1)
+        self.assertEqual(out.getvalue(),
+                         "⚠ Warning: 6 student(s) from previous groups are missing from proposed groups:\n\n"
+                         "  ... and 6 more\n"
+                         "\n")
+
+    def test_json_conflict_pairs(self):
+        """Test that JSON conflicts list students in group order and pairs sorted."""
+        conflicts = checker_for(PREV_AB).check_proposed_groups([["Bob", "Alice"]])
+
+        self.assertEqual(_conflicts_for_json(conflicts), [{
+            'group_index': 0,
+            'group_members': ["Bob", "Alice"],
+            'conflicts': [{'students': ["Bob", "Alice"], 'pair': ("Alice", "Bob")}]
+        }])
+
+
+@io_test
+class TestCommandLine(unittest.TestCase):
+    """Test cases for running the command-line tool."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Write every fixture file once into a directory shared by the class."""
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.tmp = Path(cls._tmp.name)
+        cls.paths = write_fixtures(cls.tmp, {
+            'previous_unicode': json.dumps([["Zoë", "Bob"]], ensure_ascii=False),
+            'proposed_unicode': json.dumps([["Bob", "Zoë"]], ensure_ascii=False),
+        })
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the temporary directory and everything in it."""
+        cls._tmp.cleanup()
+
+    def test_json_output_is_utf8(self):
+        """Test that --json writes UTF-8 even when the console encoding is ASCII."""
+        argv = ['group_check.py', '--json',
+                str(self.paths['previous_unicode']), str(self.paths['proposed_unicode'])]
+
+        out = io.TextIOWrapper(io.BytesIO(), encoding='ascii')
+        with mock.patch.object(sys, 'argv', argv), mock.patch.object(sys, 'stdout', out), \
+                self.assertRaises(SystemExit) as cm:
+            main()
+        out.flush()
+
+        self.assertEqual(cm.exception.code, 1)
+        result = json.loads(out.buffer.getvalue().decode('utf-8'))
+        self.assertEqual(result['conflicts'][0]['conflicts'],
+                         [{'students': ["Bob", "Zoë"], 'pair': ["Bob", "Zoë"]}])
 
 
 if __name__ == '__main__':